@@ -0,0 +1,59 @@
+# Times the conversion of Capsule timestamps to spreadsheet serial dates
+# against the general-purpose parsers it replaces; run with:
+#
+#   python benchmarks/serial_dates.py
+
+import os
+import random
+import timeit
+import importlib.util
+from datetime import datetime
+
+COUNT = 100000
+REPEAT = 5
+
+def load_function(name):
+
+    # function files have dashes in their names, so load them by path
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', name + '.py')
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def get_timestamps(count):
+
+    # spread across a few years so the day cache sees a realistic hit rate
+    rand = random.Random(0)
+    timestamps = []
+    for i in range(count):
+        timestamps.append('%04d-%02d-%02dT%02d:%02d:%02dZ' % (
+            rand.randint(2015, 2020), rand.randint(1, 12), rand.randint(1, 28),
+            rand.randint(0, 23), rand.randint(0, 59), rand.randint(0, 59)))
+    return timestamps
+
+def main():
+
+    function = load_function('capsule-opportunities')
+    timestamps = get_timestamps(COUNT)
+
+    # each function invocation starts with an empty day cache, so time the
+    # cold case by clearing it before every run; the warm case is what the
+    # later pages of a large result see
+    cold = function.get_serial_day.cache_clear
+    warm = 'pass'
+
+    cases = [
+        ('to_serial_dates (cold)', lambda: function.to_serial_dates(timestamps), cold),
+        ('to_serial_dates (warm)', lambda: function.to_serial_dates(timestamps), warm),
+        ('fromisoformat', lambda: [function.get_serial_datetime(value) for value in timestamps], warm),
+        ('strptime', lambda: [datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ') for value in timestamps], warm)
+    ]
+
+    print('%d timestamps, best of %d' % (COUNT, REPEAT))
+    for name, case, setup in cases:
+        seconds = min(timeit.repeat(case, setup=setup, number=1, repeat=REPEAT))
+        print('%-24s %.3fs' % (name, seconds))
+
+if __name__ == '__main__':
+    main()
@@ -34,23 +34,23 @@
 #     type: integer
 #     description: The probability of winning the opportunity
 #   - name: created_at
-#     type: string
-#     description: The date the opportunity was created
+#     type: number
+#     description: The date the opportunity was created, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: updated_at
-#     type: string
-#     description: The date when the opportunity was last updated
+#     type: number
+#     description: The date when the opportunity was last updated, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: expected_close_on
-#     type: string
-#     description: The expected close date of this opportunity
+#     type: number
+#     description: The expected close date of this opportunity, as a serial date number (days since 1899-12-30)
 #   - name: closed_on
-#     type: string
-#     description: The date this opportunity was closed
+#     type: number
+#     description: The date this opportunity was closed, as a serial date number (days since 1899-12-30)
 #   - name: last_contacted_at
-#     type: string
-#     description: The date when this opportuntiy was last time contacted
+#     type: number
+#     description: The date when this opportuntiy was last time contacted, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: last_stage_changed_at
-#     type: string
-#     description: The date when this opportuntiy last had its milestone changes
+#     type: number
+#     description: The date when this opportuntiy last had its milestone changes, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: duration
 #     type: integer
 #     description: The duration of the opportunity
@@ -97,6 +97,8 @@
 #   - '""'
 #   - '"id, name, value_amount"'
 # notes: |
+#   Date and date/time properties are returned as spreadsheet serial date numbers (days since 1899-12-30, with the time as a fraction of a day in UTC), so they can be formatted as dates in the spreadsheet. Dates that can't be parsed are returned empty. Filters on these properties compare against the serial number rather than the date text, e.g. created_at=43831 rather than created_at=2020-01-01.
+#
 #   See here for more information about Capsule opportunity properties: https://developer.capsulecrm.com/v2/models/opportunity
 # ---
 
@@ -106,6 +108,7 @@ import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 from datetime import *
+from functools import lru_cache
 from decimal import *
 from collections import OrderedDict
 
@@ -146,9 +149,11 @@ def get_data(params):
         if len(data) == 0: # sanity check in case there's an issue with cursor
             break
 
+        items = [get_item_info(item) for item in data]
+        items = convert_types(items, property_types)
+
         buffer = ''
-        for item in data:
-            item = get_item_info(item)
+        for item in items:
             buffer = buffer + json.dumps(item, default=to_string) + "\n"
         yield buffer
 
@@ -175,10 +180,6 @@ def requests_retry_session(
     session.mount('https://', adapter)
     return session
 
-def to_date(value):
-    # TODO: convert if needed
-    return value
-
 def to_string(value):
     if isinstance(value, (date, datetime)):
         return value.isoformat()
@@ -186,6 +187,89 @@ def to_string(value):
         return str(value)
     return value
 
+def convert_types(items, column_types):
+
+    # convert a page of items a column at a time; columns with types that
+    # don't need converting are left as returned by the API
+    for name, column_type in column_types.items():
+        converter = type_converters.get(column_type)
+        if converter is None:
+            continue
+        values = converter([item.get(name) for item in items])
+        for item, value in zip(items, values):
+            item[name] = value
+    return items
+
+def to_serial_dates(values):
+
+    # convert ISO dates/timestamps to spreadsheet serial dates (days since
+    # 1899-12-30, with the time as a fraction of a day); Capsule returns dates
+    # as 'YYYY-MM-DD' and timestamps in UTC as 'YYYY-MM-DDTHH:MM:SSZ', so
+    # parse those formats directly and only fall back to the general parser
+    # for anything else
+    serials = []
+    for value in values:
+        if not isinstance(value, str) or len(value) < 10:
+            serials.append(None)
+            continue
+        try:
+            if value[4] == '-' and value[7] == '-':
+                if len(value) == 10:
+                    serials.append(get_serial_day(value))
+                    continue
+                seconds = get_time_seconds(value)
+                if seconds is not None:
+                    serials.append(get_serial_day(value[:10]) + seconds/86400)
+                    continue
+            serials.append(get_serial_datetime(value))
+        except ValueError:
+            serials.append(None) # keep the column numeric if a value can't be parsed
+    return serials
+
+def get_time_seconds(value):
+
+    # seconds into the day for a 'YYYY-MM-DDTHH:MM:SSZ' timestamp, or None
+    # if the value isn't in exactly that form
+    if len(value) != 20 or value[10] != 'T' or value[13] != ':' or value[16] != ':' or value[19] != 'Z':
+        return None
+    hours, minutes, seconds = value[11:13], value[14:16], value[17:19]
+    if not (hours.isdigit() and minutes.isdigit() and seconds.isdigit()):
+        return None
+    hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+    if hours >= 24 or minutes >= 60 or seconds >= 60:
+        return None
+    return hours*3600 + minutes*60 + seconds
+
+@lru_cache(maxsize=4096)
+def get_serial_day(value):
+    return (date.fromisoformat(value) - SERIAL_DATE_EPOCH).days
+
+def get_serial_datetime(value):
+    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - datetime.combine(SERIAL_DATE_EPOCH, time())
+    return delta.days + delta.seconds/86400 + delta.microseconds/86400000000
+
+SERIAL_DATE_EPOCH = date(1899, 12, 30)
+
+type_converters = {
+    'date': to_serial_dates,
+    'datetime': to_serial_dates
+}
+
+# properties from the "returns" section above that need converting and how to
+# convert them; date columns are declared there as numbers since they're
+# written as serial dates, so add new date properties here as well
+property_types = OrderedDict([
+    ('created_at', 'datetime'),
+    ('updated_at', 'datetime'),
+    ('expected_close_on', 'date'),
+    ('closed_on', 'date'),
+    ('last_contacted_at', 'datetime'),
+    ('last_stage_changed_at', 'datetime')
+])
+
 def get_item_info(item):
 
     # map this function's property names to the API's property names
@@ -197,12 +281,12 @@ def get_item_info(item):
     info['value_amount'] = (item.get('value') or {}).get('amount')
     info['value_currency'] = (item.get('value') or {}).get('currency')
     info['probability'] = item.get('probability')
-    info['created_at'] = to_date(item.get('createdAt'))
-    info['updated_at'] = to_date(item.get('updatedAt'))
-    info['expected_close_on'] = to_date(item.get('expectedCloseOn'))
-    info['closed_on'] = to_date(item.get('closedOn'))
-    info['last_contacted_at'] = to_date(item.get('lastContactedAt'))
-    info['last_stage_changed_at'] = to_date(item.get('lastStageChangedAt'))
+    info['created_at'] = item.get('createdAt')
+    info['updated_at'] = item.get('updatedAt')
+    info['expected_close_on'] = item.get('expectedCloseOn')
+    info['closed_on'] = item.get('closedOn')
+    info['last_contacted_at'] = item.get('lastContactedAt')
+    info['last_stage_changed_at'] = item.get('lastStageChangedAt')
     info['duration'] = item.get('duration')
     info['duration_basis'] = item.get('durationBasis')
     info['milestone_id'] = (item.get('milestone') or {}).get('id')
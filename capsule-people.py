@@ -37,14 +37,14 @@
 #     type: string
 #     description: A comma-separated list of tags associated with the person
 #   - name: created_at
-#     type: string
-#     description: The date/time when the information for the person was created
+#     type: number
+#     description: The date/time when the information for the person was created, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: updated_at
-#     type: string
-#     description: The date/time when the information for the person was last updated
+#     type: number
+#     description: The date/time when the information for the person was last updated, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: last_contacted_at
-#     type: string
-#     description: The date/time when the person was last contacted
+#     type: number
+#     description: The date/time when the person was last contacted, as a serial date number (days since 1899-12-30, with the time as a fraction of a day in UTC)
 #   - name: address_id
 #     type: integer
 #     description: The id of the address associated with the person
@@ -91,6 +91,8 @@
 #   - '""'
 #   - '"id, first_name, last_name"'
 # notes: |
+#   Date and date/time properties are returned as spreadsheet serial date numbers (days since 1899-12-30, with the time as a fraction of a day in UTC), so they can be formatted as dates in the spreadsheet. Dates that can't be parsed are returned empty. Filters on these properties compare against the serial number rather than the date text, e.g. created_at=43831 rather than created_at=2020-01-01.
+#
 #   See here for more information about Capsule party properties: https://developer.capsulecrm.com/v2/models/party
 # ---
 
@@ -100,6 +102,7 @@ import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 from datetime import *
+from functools import lru_cache
 from decimal import *
 from collections import OrderedDict
 
@@ -140,18 +143,21 @@ def get_data(params):
         if len(data) == 0: # sanity check in case there's an issue with cursor
             break
 
-        buffer = ''
+        items = []
         for header_item in data:
             if header_item.get('type') != 'person': # limit results to person type
                 continue
             detail_items_all =  header_item.get('addresses',[])
             if len(detail_items_all) == 0:
-                item = get_item_info(header_item, {}) # if we don't have any addresses, make sure to return item header info
-                buffer = buffer + json.dumps(item, default=to_string) + "\n"
+                items.append(get_item_info(header_item, {})) # if we don't have any addresses, make sure to return item header info
             else:
                 for detail_item in detail_items_all:
-                    item = get_item_info(header_item, detail_item)
-                    buffer = buffer + json.dumps(item, default=to_string) + "\n"
+                    items.append(get_item_info(header_item, detail_item))
+        items = convert_types(items, property_types)
+
+        buffer = ''
+        for item in items:
+            buffer = buffer + json.dumps(item, default=to_string) + "\n"
         yield buffer
 
         page_url = (response.links.get('next') or {}).get('url')
@@ -177,10 +183,6 @@ def requests_retry_session(
     session.mount('https://', adapter)
     return session
 
-def to_date(value):
-    # TODO: convert if needed
-    return value
-
 def to_string(value):
     if isinstance(value, (date, datetime)):
         return value.isoformat()
@@ -188,6 +190,86 @@ def to_string(value):
         return str(value)
     return value
 
+def convert_types(items, column_types):
+
+    # convert a page of items a column at a time; columns with types that
+    # don't need converting are left as returned by the API
+    for name, column_type in column_types.items():
+        converter = type_converters.get(column_type)
+        if converter is None:
+            continue
+        values = converter([item.get(name) for item in items])
+        for item, value in zip(items, values):
+            item[name] = value
+    return items
+
+def to_serial_dates(values):
+
+    # convert ISO dates/timestamps to spreadsheet serial dates (days since
+    # 1899-12-30, with the time as a fraction of a day); Capsule returns dates
+    # as 'YYYY-MM-DD' and timestamps in UTC as 'YYYY-MM-DDTHH:MM:SSZ', so
+    # parse those formats directly and only fall back to the general parser
+    # for anything else
+    serials = []
+    for value in values:
+        if not isinstance(value, str) or len(value) < 10:
+            serials.append(None)
+            continue
+        try:
+            if value[4] == '-' and value[7] == '-':
+                if len(value) == 10:
+                    serials.append(get_serial_day(value))
+                    continue
+                seconds = get_time_seconds(value)
+                if seconds is not None:
+                    serials.append(get_serial_day(value[:10]) + seconds/86400)
+                    continue
+            serials.append(get_serial_datetime(value))
+        except ValueError:
+            serials.append(None) # keep the column numeric if a value can't be parsed
+    return serials
+
+def get_time_seconds(value):
+
+    # seconds into the day for a 'YYYY-MM-DDTHH:MM:SSZ' timestamp, or None
+    # if the value isn't in exactly that form
+    if len(value) != 20 or value[10] != 'T' or value[13] != ':' or value[16] != ':' or value[19] != 'Z':
+        return None
+    hours, minutes, seconds = value[11:13], value[14:16], value[17:19]
+    if not (hours.isdigit() and minutes.isdigit() and seconds.isdigit()):
+        return None
+    hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+    if hours >= 24 or minutes >= 60 or seconds >= 60:
+        return None
+    return hours*3600 + minutes*60 + seconds
+
+@lru_cache(maxsize=4096)
+def get_serial_day(value):
+    return (date.fromisoformat(value) - SERIAL_DATE_EPOCH).days
+
+def get_serial_datetime(value):
+    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - datetime.combine(SERIAL_DATE_EPOCH, time())
+    return delta.days + delta.seconds/86400 + delta.microseconds/86400000000
+
+SERIAL_DATE_EPOCH = date(1899, 12, 30)
+
+type_converters = {
+    'date': to_serial_dates,
+    'datetime': to_serial_dates
+}
+
+# properties from the "returns" section above that need converting and how to
+# convert them; date columns are declared there as numbers since they're
+# written as serial dates, so add new date properties here as well
+property_types = OrderedDict([
+    ('created_at', 'datetime'),
+    ('updated_at', 'datetime'),
+    ('last_contacted_at', 'datetime')
+])
+
 def get_item_info(header_item, detail_item):
 
     # map this function's property names to the API's property names
@@ -206,9 +288,9 @@ def get_item_info(header_item, detail_item):
         tags.append(tag['name'])
     info['tags'] = ', '.join(tags) # convert to comma-delimited string
 
-    info['created_at'] = to_date(header_item.get('createdAt'))
-    info['updated_at'] = to_date(header_item.get('updatedAt'))
-    info['last_contacted_at'] = to_date(header_item.get('lastContactedAt'))
+    info['created_at'] = header_item.get('createdAt')
+    info['updated_at'] = header_item.get('updatedAt')
+    info['last_contacted_at'] = header_item.get('lastContactedAt')
     info['address_id'] = detail_item.get('id')
     info['address_type'] = detail_item.get('type')
     info['address_street'] = detail_item.get('street')